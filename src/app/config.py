@@ -1,14 +1,10 @@
-from functools import lru_cache
+from functools import cached_property
 from typing import Optional
 
-from dotenv import load_dotenv
 from pydantic import Field, HttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
-load_dotenv()
-
-
 class AppSettings(BaseSettings):
     """Application configuration loaded from environment variables."""
 
@@ -36,14 +32,49 @@ class AppSettings(BaseSettings):
         env="LANGFUSE_HOST",
         description="Langfuse host URL.",
     )
+    langfuse_sample_rate: float = Field(
+        1.0,
+        env="LANGFUSE_SAMPLE_RATE",
+        ge=0.0,
+        le=1.0,
+        description="Fraction of traces sampled by Langfuse (head-based, per trace ID).",
+    )
+    langfuse_flush_at: int = Field(
+        50,
+        env="LANGFUSE_FLUSH_AT",
+        ge=1,
+        description="Number of spans Langfuse batches before exporting.",
+    )
+    langfuse_flush_interval: float = Field(
+        2.0,
+        env="LANGFUSE_FLUSH_INTERVAL",
+        gt=0.0,
+        description="Maximum seconds Langfuse waits before exporting a batch.",
+    )
+
+    enable_prompt_cache: bool = Field(
+        False,
+        env="ENABLE_PROMPT_CACHE",
+        description="Serve repeated (model, prompt) pairs from an in-process cache.",
+    )
+
+    @cached_property
+    def openai_base_url_str(self) -> str:
+        """OpenAI base URL as a string, serialized once per settings instance."""
+        return str(self.openai_base_url)
+
+    @cached_property
+    def langfuse_host_str(self) -> str:
+        """Langfuse host as a string without the trailing slash HttpUrl adds."""
+        return str(self.langfuse_host).rstrip("/")
+
+
+# Validated once at import so missing required environment variables fail at startup.
+SETTINGS: AppSettings = AppSettings()
 
 
-@lru_cache(maxsize=1)
 def get_settings() -> AppSettings:
     """
-    Return cached application settings.
-
-    This validates that required environment variables are present at startup.
+    Return the process-wide application settings.
     """
-    return AppSettings()
-
+    return SETTINGS
@@ -1,25 +1,36 @@
-from typing import Optional
-
-from uuid import uuid4
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Optional
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from starlette.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+
+from .middleware import RequestIDMiddleware
+from .services.llm_service import LLMServiceError, close_llm_client, get_llm_response
+from .tracing import TRACING_ENABLED, langfuse_client
 
-from .config import get_settings
-from .services.llm_service import LLMServiceError, get_llm_response
-from langfuse import get_client
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Drain batched Langfuse spans once and stop the exporter when the
+    application shuts down, so in-flight spans are not lost on SIGTERM.
+    The shared OpenAI connection pool is closed as well.
+    """
+    yield
+    await close_llm_client()
+    if langfuse_client is not None:
+        langfuse_client.flush()
+        langfuse_client.shutdown()
 
-settings = get_settings()
-langfuse_client = get_client()
 
 app = FastAPI(
     title="LLM Tracing Demo",
     version="0.1.0",
     description="FastAPI application demonstrating LLM tracing with OpenRouter and Langfuse.",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -29,32 +40,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-
-@app.middleware("http")
-async def add_request_id_middleware(request: Request, call_next):
-    """
-    Ensure every request has a unique request_id available on request.state.
-    Prefer X-Request-ID header if provided, otherwise generate a UUID4.
-    """
-    header_request_id = request.headers.get("X-Request-ID")
-    request_id = header_request_id or str(uuid4())
-    request.state.request_id = request_id
-
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    return response
+app.add_middleware(RequestIDMiddleware)
 
 
 class ChatRequest(BaseModel):
-    message: str
-    model: Optional[str] = None
-    session_id: Optional[str] = None
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    message: Annotated[str, Field(description="User message sent to the LLM.")]
+    model: Annotated[Optional[str], Field(description="OpenRouter model ID override.")] = None
+    session_id: Annotated[Optional[str], Field(description="Langfuse session ID.")] = None
 
 
 class ChatResponse(BaseModel):
-    response: str
-    request_id: str
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    response: Annotated[str, Field(description="Assistant response content.")]
+    request_id: Annotated[str, Field(description="ID of the FastAPI request.")]
 
 
 @app.post("/chat", response_model=ChatResponse)
@@ -65,12 +66,10 @@ async def chat_endpoint(payload: ChatRequest, request: Request) -> ChatResponse:
     The FastAPI request ID and session ID are propagated into the Langfuse trace
     via the service layer.
     """
-    request_id: str = getattr(request.state, "request_id", str(uuid4()))
+    request_id: str = request.state.request_id
     session_id: Optional[str] = payload.session_id or request.headers.get("X-Session-ID")
 
-    # Run blocking LLM call in a threadpool so we don't block the event loop.
-    llm_response: str = await run_in_threadpool(
-        get_llm_response,
+    llm_response: str = await get_llm_response(
         payload.message,
         request_id,
         session_id,
@@ -91,41 +90,41 @@ def _record_error_span(
     This ensures errors are visible in Langfuse even if they occur outside
     of an observed function.
     """
-    if langfuse_client is None:
+    if not TRACING_ENABLED or langfuse_client is None:
         return
 
-    request_id: Optional[str] = getattr(request.state, "request_id", None)
-
     with langfuse_client.start_as_current_span(
         name=error_type,
-        input={
-            "path": str(request.url.path),
-            "method": request.method,
-            "request_id": request_id,
-        },
-        metadata={
-            "error": str(error),
-            "error_type": error_type,
-        },
         level="error",
         status_message="error",
-    ):
-        # Nothing else to do in the span body; span context captures the error.
-        ...
+    ) as span:
+        # The payload strings are still built here, but Langfuse skips serializing
+        # them onto spans dropped by the sampler.
+        span.update(
+            input={
+                "path": str(request.url.path),
+                "method": request.method,
+                "request_id": request.state.request_id,
+            },
+            metadata={
+                "error": str(error),
+                "error_type": error_type,
+            },
+        )
 
 
 @app.exception_handler(LLMServiceError)
 async def llm_service_exception_handler(
     request: Request,
     exc: LLMServiceError,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Handle errors originating from the LLM service and report them to Langfuse.
     """
     _record_error_span(request, exc, error_type="LLMServiceError")
 
-    request_id: Optional[str] = getattr(request.state, "request_id", None)
-    return JSONResponse(
+    request_id: str = request.state.request_id
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "An error occurred while calling the LLM.",
@@ -138,14 +137,14 @@ async def llm_service_exception_handler(
 async def generic_exception_handler(
     request: Request,
     exc: Exception,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Catch-all handler for unexpected errors and report them to Langfuse.
     """
     _record_error_span(request, exc, error_type="UnhandledException")
 
-    request_id: Optional[str] = getattr(request.state, "request_id", None)
-    return JSONResponse(
+    request_id: str = request.state.request_id
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error.",
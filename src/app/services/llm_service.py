@@ -1,25 +1,116 @@
-from typing import Any, Dict, Optional
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
-from openai import OpenAI
-from langfuse import observe, propagate_attributes
+import httpx
+import openai
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionSystemMessageParam
 
 from ..config import get_settings
+from ..tracing import TRACING_ENABLED, langfuse_client
+
+
+_MODEL = "anthropic/claude-3.5-sonnet"
+_SYSTEM_MSG: ChatCompletionSystemMessageParam = {
+    "role": "system",
+    "content": "You are a helpful assistant for a tracing demo.",
+}
+
+_PROMPT_CACHE_MAXSIZE = 1024
+# LRU of assistant responses keyed on (model, prompt digest).
+_response_cache: OrderedDict[Tuple[str, bytes], str] = OrderedDict()
 
 
 class LLMServiceError(Exception):
     """Raised when the LLM/OpenRouter API call fails."""
 
 
-def _get_client() -> OpenAI:
+@lru_cache(maxsize=1)
+def _get_client() -> AsyncOpenAI:
+    """
+    Return a process-wide async OpenAI client.
+
+    The client is built once so its connection pool (and TLS sessions) are
+    reused across requests instead of being set up for every chat call.
+    """
     settings = get_settings()
-    return OpenAI(
-        base_url=str(settings.openai_base_url),
+    return AsyncOpenAI(
+        base_url=settings.openai_base_url_str,
         api_key=settings.openai_api_key,
+        http_client=openai.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        ),
     )
 
 
-@observe(name="llm-tracing-demo", as_type="generation")
-def get_llm_response(
+async def close_llm_client() -> None:
+    """
+    Close the shared OpenAI client and its connection pool, if it was created.
+    """
+    if _get_client.cache_info().currsize:
+        await _get_client().close()
+        _get_client.cache_clear()
+
+
+def _extract_content(completion: ChatCompletion) -> str:
+    """Return the assistant text from a chat completion, or raise if it is empty."""
+    message = completion.choices[0].message
+    content = getattr(message, "content", None)
+    if isinstance(content, str):
+        if content.strip():
+            return content
+        raise LLMServiceError("Empty response from LLM")
+    # OpenAI v1 may return a list of content parts
+    if isinstance(content, list) and content:
+        # Join non-empty text segments in a single pass
+        text_parts = (
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+        combined = "\n".join(t for t in text_parts if t)
+        if combined.strip():
+            return combined
+
+    raise LLMServiceError("Empty response from LLM")
+
+
+async def _complete(
+    prompt: str,
+    model_name: str,
+    cache_key: Optional[Tuple[str, bytes]],
+) -> Tuple[str, Optional[ChatCompletion]]:
+    """
+    Return the assistant content and the completion it came from.
+
+    The completion is None when the content was served from the prompt cache.
+    """
+    if cache_key is not None:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            _response_cache.move_to_end(cache_key)
+            return cached, None
+
+    try:
+        completion = await _get_client().chat.completions.create(
+            model=model_name,
+            messages=[_SYSTEM_MSG, {"role": "user", "content": prompt}],
+        )
+        content = _extract_content(completion)
+    except openai.APIError as exc:
+        raise LLMServiceError("Failed to call LLM via OpenRouter") from exc
+    except (KeyError, AttributeError, IndexError) as exc:
+        raise LLMServiceError("Unexpected LLM response structure") from exc
+
+    if cache_key is not None:
+        _response_cache[cache_key] = content
+        if len(_response_cache) > _PROMPT_CACHE_MAXSIZE:
+            _response_cache.popitem(last=False)
+    return content, completion
+
+
+async def get_llm_response(
     prompt: str,
     request_id: Optional[str] = None,
     session_id: Optional[str] = None,
@@ -28,63 +119,45 @@ def get_llm_response(
     """
     Call the LLM via OpenRouter and return the assistant's response content.
 
-    This function is traced by Langfuse via the @observe decorator.
-    When a FastAPI request ID is provided, it is attached as metadata on the trace.
+    The call is recorded as a Langfuse generation opened explicitly on the
+    client, which avoids the caller introspection done by @observe. No
+    generation is opened when tracing is disabled.
+    When provided, the FastAPI request ID is attached as metadata on the generation
+    and the session ID is set on its trace.
     """
-    client = _get_client()
-
-    def _call_llm() -> str:
-        try:
-            completion = client.chat.completions.create(
-                model=model or "anthropic/claude-3.5-sonnet",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant for a tracing demo.",
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
-            )
-        except Exception as exc:  # noqa: BLE001
-            raise LLMServiceError("Failed to call LLM via OpenRouter") from exc
-
-        try:
-            message = completion.choices[0].message
-            content = getattr(message, "content", None)
-            if isinstance(content, str):
-                if content.strip():
-                    return content
-                raise LLMServiceError("Empty response from LLM")
-            # OpenAI v1 may return a list of content parts
-            if isinstance(content, list) and content:
-                # Join text segments if present
-                text_parts = [
-                    part.get("text", "") if isinstance(part, dict) else str(part)
-                    for part in content
-                ]
-                combined = "\n".join(t for t in text_parts if t)
-                if combined.strip():
-                    return combined
-        except Exception as exc:  # noqa: BLE001
-            raise LLMServiceError("Unexpected LLM response structure") from exc
-
-        raise LLMServiceError("Empty response from LLM")
-
-    attributes: Dict[str, Any] = {}
-
-    if session_id:
-        attributes["session_id"] = session_id
-
-    if request_id:
-        attributes["metadata"] = {"request_id": request_id}
-
-    if attributes:
-        # Attach FastAPI request/session identifiers to the current Langfuse trace
-        with propagate_attributes(**attributes):
-            return _call_llm()
-
-    return _call_llm()
-
+    model_name = model or _MODEL
+    cache_key: Optional[Tuple[str, bytes]] = None
+    if get_settings().enable_prompt_cache:
+        cache_key = (
+            model_name,
+            hashlib.blake2b(prompt.encode(), digest_size=16).digest(),
+        )
+
+    if not TRACING_ENABLED or langfuse_client is None:
+        content, _ = await _complete(prompt, model_name, cache_key)
+        return content
+
+    with langfuse_client.start_as_current_observation(
+        as_type="generation",
+        name="llm-tracing-demo",
+        model=model_name,
+        input=prompt,
+        metadata={"request_id": request_id} if request_id else None,
+    ) as generation:
+        if session_id:
+            generation.update_trace(session_id=session_id)
+
+        content, completion = await _complete(prompt, model_name, cache_key)
+        if completion is None:
+            generation.update(output=content, metadata={"cache_hit": True})
+            return content
+
+        usage_details: Optional[Dict[str, int]] = None
+        if completion.usage is not None:
+            usage_details = {
+                "prompt_tokens": completion.usage.prompt_tokens,
+                "completion_tokens": completion.usage.completion_tokens,
+                "total_tokens": completion.usage.total_tokens,
+            }
+        generation.update(output=content, usage_details=usage_details)
+        return content
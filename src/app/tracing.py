@@ -0,0 +1,36 @@
+"""
+Process-wide Langfuse client shared by the API layer and the LLM service.
+"""
+
+import os
+from typing import Optional
+
+from langfuse import Langfuse
+
+from .config import get_settings
+
+
+settings = get_settings()
+# langfuse 3.14's span processor drops the flush_at/flush_interval kwargs unless
+# LANGFUSE_FLUSH_AT/LANGFUSE_FLUSH_INTERVAL are also in os.environ, and .env values
+# only reach AppSettings. Export them so the configured batching takes effect.
+os.environ.setdefault("LANGFUSE_FLUSH_AT", str(settings.langfuse_flush_at))
+os.environ.setdefault("LANGFUSE_FLUSH_INTERVAL", str(settings.langfuse_flush_interval))
+
+# Only build a Langfuse client when credentials are configured, so unconfigured
+# deployments don't pay for no-op spans.
+langfuse_client: Optional[Langfuse] = (
+    Langfuse(
+        public_key=settings.langfuse_public_key,
+        secret_key=settings.langfuse_secret_key,
+        host=settings.langfuse_host_str,
+        # The SDK treats sample_rate=0.0 as unset, so disable tracing explicitly.
+        tracing_enabled=settings.langfuse_sample_rate > 0.0,
+        sample_rate=settings.langfuse_sample_rate,
+        flush_at=settings.langfuse_flush_at,
+        flush_interval=settings.langfuse_flush_interval,
+    )
+    if settings.langfuse_public_key and settings.langfuse_secret_key
+    else None
+)
+TRACING_ENABLED: bool = langfuse_client is not None and settings.langfuse_sample_rate > 0.0